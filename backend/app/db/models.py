@@ -53,6 +53,11 @@ class UserProgress(Base):
     correct_attempts = Column(Integer, default=0)
     last_activity_at = Column(DateTime, server_default=func.now())
 
+    # Progress is always looked up per user and module
+    __table_args__ = (
+        Index('idx_user_module', 'user_id', 'module'),
+    )
+
 
 class ConversationSession(Base):
     """Store conversation session data and chat history."""
@@ -66,6 +71,10 @@ class ConversationSession(Base):
     updated_at = Column(DateTime, onupdate=func.now())
     is_active = Column(Boolean, default=True)
 
+    __table_args__ = (
+        Index('idx_conversation_user', 'user_id'),
+    )
+
 
 class PlacementTest(Base):
     """Store placement test data and results."""
@@ -8,9 +8,11 @@ Handles:
 - Archiving progress history
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Bundle, Session, load_only
+from sqlalchemy import and_, case, func, select, true
+from sqlalchemy.engine import Row
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Optional, Dict, List
 from uuid import uuid4
 
@@ -27,58 +29,112 @@ from app.schemas.progress import (
 # CEFR level progression
 LEVEL_ORDER = ["A1", "A2", "B1", "B2", "C1", "C2"]
 
+# Level -> following level (None after the last one)
+_NEXT_LEVEL = dict(zip(LEVEL_ORDER, LEVEL_ORDER[1:] + [None]))
+
 # Advancement thresholds
 SCORE_THRESHOLD = 85.0  # 85% minimum for each module
 MINIMUM_ATTEMPTS = 10  # Minimum attempts per module
 CONVERSATION_MINIMUM = 20  # Minimum conversation messages
 
-# XP rewards per level
-XP_REWARDS = {
+# XP rewards per level (read-only view so callers can't change the rewards)
+XP_REWARDS = MappingProxyType({
     "A1": 100,
     "A2": 200,
     "B1": 300,
     "B2": 400,
     "C1": 500,
     "C2": 1000
-}
+})
 
 # Scored modules (exclude conversation)
-SCORED_MODULES = ["vocabulary", "grammar", "writing", "phonetics"]
+SCORED_MODULES = ("vocabulary", "grammar", "writing", "phonetics")
 
 
 def get_next_level(current_level: str) -> Optional[str]:
     """Get the next CEFR level, or None if already at max."""
-    if not current_level or current_level not in LEVEL_ORDER:
-        return "A1"
+    # Missing or unknown levels start over at A1
+    return _NEXT_LEVEL.get(current_level, "A1")
+
+
+# Progress columns the eligibility and summary code reads; selecting them as a
+# bundle skips building (and identity-map tracking) UserProgress objects
+_PROGRESS_FIELDS = Bundle(
+    "progress",
+    UserProgress.module,
+    UserProgress.score,
+    UserProgress.total_attempts,
+    UserProgress.correct_attempts,
+    UserProgress.last_activity_at
+)
 
-    current_index = LEVEL_ORDER.index(current_level)
-    if current_index < len(LEVEL_ORDER) - 1:
-        return LEVEL_ORDER[current_index + 1]
-    return None
 
+def _get_modules_progress(user_id: str, db: Session) -> Dict[str, Row]:
+    """Get the progress rows for all scored modules, keyed by module."""
+    rows = db.execute(
+        select(_PROGRESS_FIELDS).where(
+            UserProgress.user_id == user_id,
+            UserProgress.module.in_(SCORED_MODULES)
+        )
+    ).scalars()
 
-def _get_module_progress(user_id: str, module: str, db: Session) -> Optional[UserProgress]:
-    """Get progress record for a specific module."""
-    return db.query(UserProgress).filter(
-        UserProgress.user_id == user_id,
-        UserProgress.module == module
-    ).first()
+    progress_by_module = {}
+    for progress in rows:
+        progress_by_module.setdefault(progress.module, progress)
+    return progress_by_module
 
 
 def _get_conversation_message_count(user_id: str, db: Session) -> int:
     """Get total conversation messages sent by user."""
-    # Count messages from conversation_sessions context_json
-    sessions = db.query(ConversationSession).filter(
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return _count_conversation_messages_in_python(user_id, db)
+
+    # Count user messages inside context_json["messages"] in SQL, so session
+    # rows and their JSON never have to be loaded into Python
+    # Only a list of messages counts; a missing, null or non-list value adds 0
+    if dialect == "postgresql":
+        raw_messages = ConversationSession.context_json["messages"]
+        # json_array_elements raises on non-arrays and runs before WHERE, so
+        # anything else is swapped for an empty array instead of filtered out
+        message_array = case(
+            (func.json_typeof(raw_messages) == "array", raw_messages),
+            else_=func.json_build_array()
+        )
+        messages = func.json_array_elements(message_array).table_valued("value")
+        # ->> yields NULL for non-object entries, so they never match
+        is_user_message = messages.c.value.op("->>")("role") == "user"
+    else:
+        # json_each also walks objects and yields non-object entries
+        messages = func.json_each(ConversationSession.context_json, "$.messages").table_valued("value", "type")
+        is_user_message = and_(
+            func.json_type(ConversationSession.context_json, "$.messages") == "array",
+            messages.c.type == "object",
+            func.json_extract(messages.c.value, "$.role") == "user"
+        )
+
+    total_messages = db.scalar(
+        select(func.count())
+        .select_from(ConversationSession)
+        .join(messages, true())
+        .where(ConversationSession.user_id == user_id, is_user_message)
+    )
+    return total_messages or 0
+
+
+def _count_conversation_messages_in_python(user_id: str, db: Session) -> int:
+    """Count user messages by loading the sessions; works on any database."""
+    sessions = db.query(ConversationSession.context_json).filter(
         ConversationSession.user_id == user_id
-    ).all()
+    )
 
     total_messages = 0
-    for session in sessions:
-        context = session.context_json
-        if isinstance(context, dict) and "messages" in context:
+    for (context,) in sessions:
+        messages = context.get("messages") if isinstance(context, dict) else None
+        if isinstance(messages, list):
             # Count user messages only
             total_messages += sum(
-                1 for msg in context["messages"]
+                1 for msg in messages
                 if isinstance(msg, dict) and msg.get("role") == "user"
             )
 
@@ -93,10 +149,25 @@ def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
     - All 4 scored modules >= 85% with minimum 10 attempts each
     - Conversation module >= 20 messages
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    # Callers usually hold this user already, so get() is an identity-map hit
+    user = db.get(User, user_id)
     if not user:
         return {"eligible": False, "reason": "User not found"}
 
+    return _evaluate_eligibility(user, db)
+
+
+def _evaluate_eligibility(
+    user: User,
+    db: Session,
+    progress_by_module: Optional[Dict[str, Row]] = None
+) -> dict:
+    """
+    Check advancement requirements for an already-loaded user.
+
+    Module progress is queried only once the level checks pass, unless the
+    caller has loaded it already.
+    """
     if not user.level:
         return {"eligible": False, "reason": "User level not set"}
 
@@ -104,13 +175,16 @@ def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
     if not next_level:
         return {"eligible": False, "reason": "Already at maximum level (C2)"}
 
+    if progress_by_module is None:
+        progress_by_module = _get_modules_progress(user.id, db)
+
     # Check each scored module
     module_status = {}
     all_modules_ready = True
     blocking_reasons = []
 
     for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
+        progress = progress_by_module.get(module)
 
         if not progress:
             module_status[module] = {
@@ -147,7 +221,7 @@ def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
             )
 
     # Check conversation engagement
-    conversation_messages = _get_conversation_message_count(user_id, db)
+    conversation_messages = _get_conversation_message_count(user.id, db)
     conversation_ready = conversation_messages >= CONVERSATION_MINIMUM
 
     if not conversation_ready:
@@ -169,12 +243,13 @@ def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
 
 def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryResponse:
     """Get comprehensive progress summary for user."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
 
-    # Get advancement eligibility
-    eligibility = calculate_advancement_eligibility(user_id, db)
+    # Reuse the loaded progress for both eligibility and the module list
+    progress_by_module = _get_modules_progress(user_id, db)
+    eligibility = _evaluate_eligibility(user, db, progress_by_module)
 
     # Build module progress list
     modules = []
@@ -182,7 +257,7 @@ def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryRespo
     scored_count = 0
 
     for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
+        progress = progress_by_module.get(module)
 
         if progress:
             score = progress.score or 0.0
@@ -280,12 +355,13 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     5. Award XP
     6. Return celebration data
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
 
-    # Verify eligibility
-    eligibility = calculate_advancement_eligibility(user_id, db)
+    # Verify eligibility against the same progress records that get archived
+    progress_by_module = _get_modules_progress(user_id, db)
+    eligibility = _evaluate_eligibility(user, db, progress_by_module)
     if not eligibility["eligible"]:
         raise ValueError(f"Not eligible to advance: {eligibility['reason']}")
 
@@ -300,7 +376,7 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     module_attempts = {}
 
     for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
+        progress = progress_by_module.get(module)
         if progress:
             module_scores[module] = progress.score
             module_attempts[module] = progress.total_attempts
@@ -374,14 +450,14 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
 def reset_progress_for_new_level(user_id: str, db: Session):
     """Reset all module progress scores and attempts to 0, and clear conversation sessions."""
     # Reset UserProgress for all modules (vocabulary, grammar, writing, phonetics)
-    progress_records = db.query(UserProgress).filter(
+    # in a single UPDATE; already-loaded records are updated in place too
+    db.query(UserProgress).filter(
         UserProgress.user_id == user_id
-    ).all()
-
-    for progress in progress_records:
-        progress.score = 0.0
-        progress.total_attempts = 0
-        progress.correct_attempts = 0
+    ).update({
+        UserProgress.score: 0.0,
+        UserProgress.total_attempts: 0,
+        UserProgress.correct_attempts: 0
+    })
 
     # Delete all conversation sessions to reset conversation progress
     db.query(ConversationSession).filter(
@@ -389,9 +465,26 @@ def reset_progress_for_new_level(user_id: str, db: Session):
     ).delete()
 
 
+# Columns the history items are built from; the per-module attempt counts are never shown
+_HISTORY_FIELDS = (
+    LevelHistory.level,
+    LevelHistory.vocabulary_score,
+    LevelHistory.grammar_score,
+    LevelHistory.writing_score,
+    LevelHistory.phonetics_score,
+    LevelHistory.conversation_messages,
+    LevelHistory.started_at,
+    LevelHistory.completed_at,
+    LevelHistory.days_at_level,
+    LevelHistory.weighted_score
+)
+
+
 def get_level_history(user_id: str, db: Session) -> List[LevelHistoryItem]:
     """Get historical level progression for user."""
-    history_records = db.query(LevelHistory).filter(
+    history_records = db.query(LevelHistory).options(
+        load_only(*_HISTORY_FIELDS)
+    ).filter(
         LevelHistory.user_id == user_id
     ).order_by(LevelHistory.completed_at.desc()).all()
 
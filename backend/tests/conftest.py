@@ -4,46 +4,104 @@ Pytest configuration and shared fixtures.
 This file contains fixtures that are automatically available to all tests.
 """
 
-import pytest
+import asyncio
+import itertools
 import os
-from sqlalchemy import create_engine
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 
 from app.db.database import Base
 from app.db.models import User
 from app.main import app
 from app.core.security import get_password_hash
 from app.api.deps import get_db
+from tests.support.stubs import CannedReply, RecordedLLM
 
-# Test database URL - use a separate database for tests
-TEST_DATABASE_URL = "sqlite:///./test_language_app.db"
+# Test database URL - an in-memory SQLite database, so commits never hit disk
+TEST_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 
+# Durability is irrelevant for throwaway test data
+SQLITE_TEST_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA locking_mode=EXCLUSIVE",
+)
 
-@pytest.fixture(scope="function")
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the test PRAGMAs to every new SQLite connection."""
+    # Let SQLAlchemy emit BEGIN itself (see _begin_sqlite_transaction);
+    # pysqlite's own transaction handling breaks SAVEPOINTs
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_TEST_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _begin_sqlite_transaction(connection):
+    """Start transactions explicitly so nested SAVEPOINTs work on SQLite."""
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    Share one event loop across the whole test session.
+    
+    Overrides pytest-asyncio's per-test loop so async tests don't pay for
+    creating and closing a loop each time.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """
+    Hash passwords with the minimum bcrypt cost during tests.
+    
+    Each bcrypt round doubles the work, so 4 rounds instead of the default
+    12 is 256x cheaper. Only the test session is affected; hashes still
+    verify the same way.
+    """
+    fast_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    with patch('app.core.security.pwd_context', fast_context):
+        yield
+
+
+@pytest.fixture(scope="session")
 def db_engine():
     """
-    Create a test database engine.
+    Create the test database engine.
     
-    This fixture creates a new database engine for each test function
-    and cleans up after the test completes.
+    One in-memory database serves the whole test session, so the schema is
+    created only once. StaticPool keeps its single connection alive so every
+    session (and the TestClient thread) sees the same database.
     """
     engine = create_engine(
         TEST_DATABASE_URL,
-        connect_args={"check_same_thread": False}  # Needed for SQLite
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        poolclass=StaticPool
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(engine, "begin", _begin_sqlite_transaction)
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # The in-memory database starts empty, so skip the per-table existence checks
+    Base.metadata.create_all(bind=engine, checkfirst=False)
     
     yield engine
     
-    # Drop all tables after test
-    Base.metadata.drop_all(bind=engine)
-    
-    # Remove test database file
-    if os.path.exists("./test_language_app.db"):
-        os.remove("./test_language_app.db")
+    # Closing the connection discards the in-memory database
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
@@ -51,18 +109,67 @@ def db_session(db_engine):
     """
     Create a fresh database session for each test.
     
-    This ensures each test has a clean database state.
+    The session is bound to a connection whose outer transaction is rolled
+    back after the test, so nothing a test writes outlives it. Commits made
+    by the test (or the code under test) only release a SAVEPOINT.
     """
+    connection = db_engine.connect()
+    transaction = connection.begin()
     TestingSessionLocal = sessionmaker(
         autocommit=False,
         autoflush=False,
-        bind=db_engine
+        bind=connection,
+        join_transaction_mode="create_savepoint"
     )
     session = TestingSessionLocal()
     
     yield session
     
     session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """
+    Create a PostgreSQL engine for tests marked `postgres`.
+    
+    Set TEST_POSTGRES_URL to a scratch database to run them; they are skipped
+    otherwise. The schema is created for the session and dropped afterwards.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    
+    yield engine
+    
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def pg_session(pg_engine):
+    """
+    Create a PostgreSQL session whose writes are rolled back after the test.
+    """
+    connection = pg_engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=connection,
+        join_transaction_mode="create_savepoint"
+    )()
+    
+    yield session
+    
+    session.close()
+    transaction.rollback()
+    connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -114,7 +221,6 @@ def sample_user(db_session):
     )
     db_session.add(user)
     db_session.commit()
-    db_session.refresh(user)
     return user
 
 
@@ -133,10 +239,34 @@ def sample_user_advanced(db_session):
     )
     db_session.add(user)
     db_session.commit()
-    db_session.refresh(user)
     return user
 
 
+@pytest.fixture
+def make_user(db_session):
+    """
+    Factory that inserts a learner and returns it.
+    
+    The user is added to the session like the `current_user` the API hands
+    to the services, so their writes to it are flushed. flush() assigns the
+    ID without committing; the row is rolled back with the test. Usernames
+    are unique unless one is passed, so a test may create several users.
+    """
+    usernames = (f"learner{n}" for n in itertools.count(1))
+
+    def _make(target_language, level=None, username=None):
+        user = User(
+            username=username or next(usernames),
+            hashed_password="hash",
+            target_language=target_language,
+            level=level
+        )
+        db_session.add(user)
+        db_session.flush()
+        return user
+    return _make
+
+
 @pytest.fixture
 def auth_token(client, sample_user):
     """
@@ -188,6 +318,80 @@ def mock_llm_response():
     }
 
 
+# The checker and validator results are only read, so one instance serves every test
+_OK_CHECK = {"is_valid": True, "suggested_fix": None}
+_APPROVED = {"is_approved": True, "confidence_score": 0.9, "improved_version": None}
+
+
+@pytest.fixture
+def conv_mocks(monkeypatch):
+    """
+    Patch the LLM client and checker used by the conversation service.
+    
+    Returns a namespace with:
+    - llm: RecordedLLM; call `llm.script(...)` with the replies the test expects
+    - checker: `check_content` approves everything by default
+    """
+    mocks = SimpleNamespace(
+        llm=RecordedLLM(),
+        checker=SimpleNamespace(check_content=CannedReply(_OK_CHECK))
+    )
+    
+    # Resolve lazily so a test may swap in its own llm or checker
+    monkeypatch.setattr('app.services.conversation.get_llm_client', lambda: mocks.llm)
+    monkeypatch.setattr('app.services.conversation.get_checker_service', lambda: mocks.checker)
+    return mocks
+
+
+@pytest.fixture
+def grammar_mocks(monkeypatch):
+    """
+    Patch the LLM client, checker and secondary validator used by the grammar service.
+
+    Returns a namespace with:
+    - llm: set `llm.generate.return_value` to the reply the test expects
+    - checker: `check_content` approves everything by default
+    - validator: `deep_validate` approves everything by default
+    """
+    mocks = SimpleNamespace(
+        llm=SimpleNamespace(generate=CannedReply()),
+        checker=SimpleNamespace(check_content=CannedReply(_OK_CHECK)),
+        validator=SimpleNamespace(deep_validate=CannedReply(_APPROVED))
+    )
+
+    # Resolve lazily so a test may swap in its own stubs
+    monkeypatch.setattr('app.services.grammar.get_llm_client', lambda: mocks.llm)
+    monkeypatch.setattr('app.services.grammar.get_checker_service', lambda: mocks.checker)
+    monkeypatch.setattr('app.services.grammar.get_secondary_validator', lambda: mocks.validator)
+    return mocks
+
+
+@pytest.fixture
+def vocab_mocks(monkeypatch):
+    """
+    Patch the LLM, checker, secondary validator and image clients used by the vocabulary service.
+
+    Returns a namespace with:
+    - llm: RecordedLLM; script the flashcard reply, then the image description reply
+    - checker: `check_content` approves everything by default
+    - validator: `deep_validate` approves everything by default
+    - image: `generate_safe_image` returns placeholder image data
+    """
+    mocks = SimpleNamespace(
+        llm=RecordedLLM(),
+        checker=SimpleNamespace(check_content=CannedReply(_OK_CHECK)),
+        validator=SimpleNamespace(deep_validate=CannedReply(_APPROVED)),
+        image=SimpleNamespace(generate_safe_image=CannedReply("base64imagedata"))
+    )
+
+    # Resolve lazily so a test may swap in its own stubs
+    monkeypatch.setattr('app.services.vocabulary.get_llm_client', lambda: mocks.llm)
+    monkeypatch.setattr('app.services.vocabulary.get_checker_service', lambda: mocks.checker)
+    monkeypatch.setattr('app.services.vocabulary.get_secondary_validator', lambda: mocks.validator)
+    monkeypatch.setattr('app.services.vocabulary.get_image_client', lambda: mocks.image)
+    return mocks
+
+
 @pytest.fixture
 def mock_vocabulary_flashcard():
     """
@@ -0,0 +1 @@
+# Shared test helpers
@@ -0,0 +1,31 @@
+"""
+Database assertion helpers shared by the service tests.
+"""
+
+from sqlalchemy import bindparam, select
+
+from app.db.models import UserProgress
+
+# Built once; each lookup only binds the user and module
+_PROGRESS_Q = select(UserProgress).where(
+    UserProgress.user_id == bindparam("user_id"),
+    UserProgress.module == bindparam("module")
+)
+
+
+def assert_progress(db_session, user_id, module, *, total=None, correct=None, score=None):
+    """
+    Assert that the user has progress for the module and return it.
+    
+    Only the counters that are passed are checked.
+    """
+    progress = db_session.scalars(_PROGRESS_Q, {"user_id": user_id, "module": module}).first()
+
+    assert progress is not None
+    if total is not None:
+        assert progress.total_attempts == total
+    if correct is not None:
+        assert progress.correct_attempts == correct
+    if score is not None:
+        assert progress.score == score
+    return progress
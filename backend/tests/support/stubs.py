@@ -0,0 +1,56 @@
+"""
+Lightweight async stand-ins for the AI service clients.
+
+Plain coroutines are much cheaper than AsyncMock, which builds child mocks
+and records every call; use these wherever no test inspects the calls.
+"""
+
+
+def fence(payload):
+    """Wrap serialized JSON in a ```json code fence, the way the LLM usually replies."""
+    return f"```json\n{payload}\n```"
+
+
+class RecordedLLM:
+    """
+    Stand-in LLM client that replays canned replies in call order.
+    
+    generate() is a plain coroutine pulling from an iterator, so calls skip
+    AsyncMock's call bookkeeping and never copy the script. A reply that is
+    an exception instance is raised instead of returned.
+    """
+
+    def __init__(self, *replies):
+        self.script(*replies)
+
+    def script(self, *replies):
+        """Set the replies returned by the next generate() calls."""
+        self._replies = iter(replies)
+
+    async def generate(self, *args, **kwargs):
+        try:
+            reply = next(self._replies)
+        except StopIteration:
+            # A StopIteration escaping a coroutine surfaces as a RuntimeError
+            raise AssertionError("RecordedLLM: no scripted reply left") from None
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+    async def close(self):
+        pass
+
+
+class CannedReply:
+    """
+    Async callable that always returns `return_value`.
+    
+    A cheaper AsyncMock for stubs whose calls no test inspects; tests can
+    still reassign `return_value`.
+    """
+
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+
+    async def __call__(self, *args, **kwargs):
+        return self.return_value
@@ -6,6 +6,7 @@ These tests verify model creation, relationships, constraints, and data integrit
 
 import pytest
 from datetime import datetime
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.exc import IntegrityError
 
 from app.db.models import (
@@ -16,97 +17,92 @@ from app.db.models import (
     ContentLog,
     LevelHistory
 )
-from app.core.security import get_password_hash
+
+# Keep the whole file on one xdist worker under --dist=loadgroup
+pytestmark = pytest.mark.xdist_group(name="db_models")
+
+# Lookups by owner, built once; each test only binds the user ID
+_PROGRESS_BY_USER = select(UserProgress).where(UserProgress.user_id == bindparam("uid"))
+_HISTORY_BY_USER = select(LevelHistory).where(LevelHistory.user_id == bindparam("uid"))
+_COUNT_BY_USER = {
+    model: select(func.count()).select_from(model).where(model.user_id == bindparam("uid"))
+    for model in (UserProgress, ConversationSession)
+}
+
+
+def _insert_returning(db_session, model, values):
+    """
+    Insert one row with a Core INSERT ... RETURNING and return it as a mapping.
+    
+    Column defaults, including server-side ones like created_at, come back in
+    the same round trip, so there is no refresh SELECT.
+    """
+    table = model.__table__
+    return db_session.execute(table.insert().returning(*table.c), values).mappings().one()
+
+
+def persist(db_session, obj):
+    """
+    Flush a new object and return it.
+    
+    Nothing is committed, so the object is never expired, and the INSERT
+    fetches server defaults via RETURNING; no refresh SELECT is needed.
+    """
+    db_session.add(obj)
+    db_session.flush()
+    return obj
 
 
 class TestUserModel:
     """Test cases for User model."""
     
-    def test_create_user_with_all_fields(self, db_session):
-        """Test creating a user with all fields populated."""
-        # Arrange & Act
-        user = User(
-            username="fulluser",
-            hashed_password=get_password_hash("password123"),
-            full_name="Full User",
-            target_language="Spanish",
-            level="B1",
-            is_active=True,
-            placement_test_completed=True,
-            placement_test_score=85.5,
-            total_xp=1000
-        )
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
-        
-        # Assert
-        assert user.id is not None
-        assert user.username == "fulluser"
-        assert user.full_name == "Full User"
-        assert user.target_language == "Spanish"
-        assert user.level == "B1"
-        assert user.is_active is True
-        assert user.placement_test_completed is True
-        assert user.placement_test_score == 85.5
-        assert user.total_xp == 1000
-        assert user.created_at is not None
-    
-    def test_create_user_with_minimal_fields(self, db_session):
-        """Test creating a user with only required fields."""
+    @pytest.mark.parametrize("values,expected", [
+        (
+            dict(
+                username="fulluser",
+                hashed_password="hashed_password",
+                full_name="Full User",
+                target_language="Spanish",
+                level="B1",
+                is_active=True,
+                placement_test_completed=True,
+                placement_test_score=85.5,
+                total_xp=1000
+            ),
+            {}
+        ),
+        (
+            dict(username="minimaluser", hashed_password="hashed_password"),
+            # Column defaults
+            dict(is_active=True, placement_test_completed=False, total_xp=0)
+        ),
+    ], ids=["all_fields", "minimal_fields"])
+    def test_create_user(self, db_session, values, expected):
+        """Test that a new user keeps its fields and gets an ID, timestamp and defaults."""
         # Arrange & Act
-        user = User(
-            username="minimaluser",
-            hashed_password="hashed_password"
-        )
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+        user = _insert_returning(db_session, User, values)
         
         # Assert
-        assert user.id is not None
-        assert user.username == "minimaluser"
-        assert user.is_active is True  # Default value
-        assert user.placement_test_completed is False  # Default value
-        assert user.total_xp == 0  # Default value
+        assert user["id"] is not None
+        assert len(user["id"]) > 0  # UUID string
+        assert isinstance(user["created_at"], datetime)
+        for column, value in {**values, **expected}.items():
+            assert user[column] == value
+            assert type(user[column]) is type(value)
     
     def test_user_unique_username_constraint(self, db_session):
         """Test that duplicate usernames raise an integrity error."""
         # Arrange
         user1 = User(username="duplicate", hashed_password="hash1")
-        db_session.add(user1)
-        db_session.commit()
+        persist(db_session, user1)
         
         # Act & Assert
         user2 = User(username="duplicate", hashed_password="hash2")
         db_session.add(user2)
         
+        # The constraint fires when the INSERT is flushed; no commit needed
         with pytest.raises(IntegrityError):
-            db_session.commit()
-    
-    def test_user_auto_generates_id(self, db_session):
-        """Test that user ID is automatically generated."""
-        # Arrange & Act
-        user = User(username="autoid", hashed_password="hash")
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
-        
-        # Assert
-        assert user.id is not None
-        assert len(user.id) > 0  # UUID string
-    
-    def test_user_timestamps(self, db_session):
-        """Test that created_at timestamp is automatically set."""
-        # Arrange & Act
-        user = User(username="timestamps", hashed_password="hash")
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
-        
-        # Assert
-        assert user.created_at is not None
-        assert isinstance(user.created_at, datetime)
+            db_session.flush()
 
 
 class TestUserProgressModel:
@@ -122,9 +118,7 @@ class TestUserProgressModel:
             total_attempts=10,
             correct_attempts=8
         )
-        db_session.add(progress)
-        db_session.commit()
-        db_session.refresh(progress)
+        persist(db_session, progress)
         
         # Assert
         assert progress.id is not None
@@ -138,36 +132,27 @@ class TestUserProgressModel:
     def test_user_progress_default_values(self, db_session, sample_user):
         """Test user progress default values."""
         # Arrange & Act
-        progress = UserProgress(
+        progress = _insert_returning(db_session, UserProgress, dict(
             user_id=sample_user.id,
             module="grammar"
-        )
-        db_session.add(progress)
-        db_session.commit()
-        db_session.refresh(progress)
+        ))
         
         # Assert
-        assert progress.total_attempts == 0
-        assert progress.correct_attempts == 0
-        assert progress.last_activity_at is not None
+        assert progress["total_attempts"] == 0
+        assert progress["correct_attempts"] == 0
+        assert progress["last_activity_at"] is not None
     
     def test_multiple_progress_entries_per_user(self, db_session, sample_user):
         """Test that a user can have multiple progress entries."""
         # Arrange & Act
         modules = ["vocabulary", "grammar", "conversation", "writing"]
-        for module in modules:
-            progress = UserProgress(
-                user_id=sample_user.id,
-                module=module,
-                total_attempts=5
-            )
-            db_session.add(progress)
-        db_session.commit()
+        db_session.execute(UserProgress.__table__.insert(), [
+            {"user_id": sample_user.id, "module": module, "total_attempts": 5}
+            for module in modules
+        ])
         
         # Assert
-        user_progress = db_session.query(UserProgress).filter_by(
-            user_id=sample_user.id
-        ).all()
+        user_progress = db_session.scalars(_PROGRESS_BY_USER, {"uid": sample_user.id}).all()
         assert len(user_progress) == 4
         
         # Verify all modules are present
@@ -190,9 +175,7 @@ class TestConversationSessionModel:
             },
             is_active=True
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        persist(db_session, session)
         
         # Assert
         assert session.id is not None
@@ -208,9 +191,7 @@ class TestConversationSessionModel:
         session = ConversationSession(
             user_id=sample_user.id
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        persist(db_session, session)
         
         # Assert
         assert session.context_json == {} or session.context_json is not None
@@ -233,9 +214,9 @@ class TestConversationSessionModel:
             user_id=sample_user.id,
             context_json=conversation_data
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        persist(db_session, session)
+        # Reload the column so the assertions see the deserialized stored JSON
+        db_session.expire(session, ["context_json"])
         
         # Assert
         assert session.context_json == conversation_data
@@ -248,23 +229,20 @@ class TestPlacementTestModel:
     def test_create_placement_test(self, db_session, sample_user):
         """Test creating a placement test."""
         # Arrange & Act
-        test = PlacementTest(
+        test = _insert_returning(db_session, PlacementTest, dict(
             user_id=sample_user.id,
             target_language="German",
             completed=False,
             questions_data={"questions": []},
             answers_data={}
-        )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        ))
         
         # Assert
-        assert test.id is not None
-        assert test.user_id == sample_user.id
-        assert test.target_language == "German"
-        assert test.completed is False
-        assert test.test_date is not None
+        assert test["id"] is not None
+        assert test["user_id"] == sample_user.id
+        assert test["target_language"] == "German"
+        assert test["completed"] is False
+        assert test["test_date"] is not None
     
     def test_placement_test_with_scores(self, db_session, sample_user):
         """Test placement test with all score fields."""
@@ -281,9 +259,7 @@ class TestPlacementTestModel:
             overall_score=81.8,
             determined_level="B1"
         )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        persist(db_session, test)
         
         # Assert
         assert test.vocabulary_score == 85.0
@@ -315,11 +291,13 @@ class TestPlacementTestModel:
             questions_data=questions,
             answers_data=answers
         )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        persist(db_session, test)
+        # Reload the columns so the assertions see the deserialized stored JSON
+        db_session.expire(test, ["questions_data", "answers_data"])
         
         # Assert
+        assert test.questions_data == questions
+        assert test.answers_data == answers
         assert len(test.questions_data["questions"]) == 2
         assert len(test.answers_data["answers"]) == 2
 
@@ -330,25 +308,22 @@ class TestContentLogModel:
     def test_create_content_log(self, db_session, sample_user):
         """Test creating a content log entry."""
         # Arrange & Act
-        log = ContentLog(
+        log = _insert_returning(db_session, ContentLog, dict(
             user_id=sample_user.id,
             module="vocabulary",
             input_payload={"language": "German", "level": "A1"},
             generated_content={"word": "Haus", "meaning": "house"},
             is_validated=False
-        )
-        db_session.add(log)
-        db_session.commit()
-        db_session.refresh(log)
+        ))
         
         # Assert
-        assert log.id is not None
-        assert log.user_id == sample_user.id
-        assert log.module == "vocabulary"
-        assert log.input_payload["language"] == "German"
-        assert log.generated_content["word"] == "Haus"
-        assert log.is_validated is False
-        assert log.created_at is not None
+        assert log["id"] is not None
+        assert log["user_id"] == sample_user.id
+        assert log["module"] == "vocabulary"
+        assert log["input_payload"]["language"] == "German"
+        assert log["generated_content"]["word"] == "Haus"
+        assert log["is_validated"] is False
+        assert log["created_at"] is not None
     
     def test_content_log_with_validation(self, db_session, sample_user):
         """Test content log with checker and validation results."""
@@ -362,9 +337,7 @@ class TestContentLogModel:
             secondary_validation={"human_verified": True},
             is_validated=True
         )
-        db_session.add(log)
-        db_session.commit()
-        db_session.refresh(log)
+        persist(db_session, log)
         
         # Assert
         assert log.checker_result["is_valid"] is True
@@ -381,7 +354,7 @@ class TestLevelHistoryModel:
         started_at = datetime.utcnow()
         
         # Act
-        history = LevelHistory(
+        history = _insert_returning(db_session, LevelHistory, dict(
             user_id=sample_user.id,
             level="A2",
             vocabulary_score=85.0,
@@ -396,19 +369,16 @@ class TestLevelHistoryModel:
             started_at=started_at,
             days_at_level=45,
             weighted_score=81.25
-        )
-        db_session.add(history)
-        db_session.commit()
-        db_session.refresh(history)
+        ))
         
         # Assert
-        assert history.id is not None
-        assert history.user_id == sample_user.id
-        assert history.level == "A2"
-        assert history.vocabulary_score == 85.0
-        assert history.days_at_level == 45
-        assert history.weighted_score == 81.25
-        assert history.completed_at is not None
+        assert history["id"] is not None
+        assert history["user_id"] == sample_user.id
+        assert history["level"] == "A2"
+        assert history["vocabulary_score"] == 85.0
+        assert history["days_at_level"] == 45
+        assert history["weighted_score"] == 81.25
+        assert history["completed_at"] is not None
     
     def test_level_history_default_values(self, db_session, sample_user):
         """Test level history default values."""
@@ -419,9 +389,7 @@ class TestLevelHistoryModel:
             started_at=datetime.utcnow(),
             weighted_score=75.0
         )
-        db_session.add(history)
-        db_session.commit()
-        db_session.refresh(history)
+        persist(db_session, history)
         
         # Assert
         assert history.conversation_messages == 0
@@ -432,22 +400,21 @@ class TestLevelHistoryModel:
         """Test tracking progression through multiple levels."""
         # Arrange
         levels = ["A1", "A2", "B1"]
+        started_at = datetime.utcnow()
         
         # Act
-        for level in levels:
-            history = LevelHistory(
-                user_id=sample_user.id,
-                level=level,
-                started_at=datetime.utcnow(),
-                weighted_score=80.0
-            )
-            db_session.add(history)
-        db_session.commit()
+        db_session.execute(LevelHistory.__table__.insert(), [
+            {
+                "user_id": sample_user.id,
+                "level": level,
+                "started_at": started_at,
+                "weighted_score": 80.0
+            }
+            for level in levels
+        ])
         
         # Assert
-        user_history = db_session.query(LevelHistory).filter_by(
-            user_id=sample_user.id
-        ).all()
+        user_history = db_session.scalars(_HISTORY_BY_USER, {"uid": sample_user.id}).all()
         assert len(user_history) == 3
         
         # Verify all levels are tracked
@@ -458,30 +425,16 @@ class TestLevelHistoryModel:
 class TestModelRelationships:
     """Test relationships between models."""
     
-    def test_user_has_multiple_progress_entries(self, db_session, sample_user):
-        """Test that a user can have multiple progress entries."""
-        # Arrange & Act
-        progress1 = UserProgress(user_id=sample_user.id, module="vocabulary")
-        progress2 = UserProgress(user_id=sample_user.id, module="grammar")
-        db_session.add_all([progress1, progress2])
-        db_session.commit()
-        
-        # Assert
-        progress_count = db_session.query(UserProgress).filter_by(
-            user_id=sample_user.id
-        ).count()
-        assert progress_count == 2
-    
-    def test_user_has_multiple_conversation_sessions(self, db_session, sample_user):
-        """Test that a user can have multiple conversation sessions."""
+    @pytest.mark.parametrize("model,rows", [
+        (UserProgress, [{"module": "vocabulary"}, {"module": "grammar"}]),
+        (ConversationSession, [{}, {}]),
+    ], ids=["progress_entries", "conversation_sessions"])
+    def test_user_has_multiple_children(self, db_session, sample_user, model, rows):
+        """Test that a user can own several rows of a child model."""
         # Arrange & Act
-        session1 = ConversationSession(user_id=sample_user.id)
-        session2 = ConversationSession(user_id=sample_user.id)
-        db_session.add_all([session1, session2])
-        db_session.commit()
+        db_session.add_all([model(user_id=sample_user.id, **row) for row in rows])
+        db_session.flush()
         
         # Assert
-        session_count = db_session.query(ConversationSession).filter_by(
-            user_id=sample_user.id
-        ).count()
-        assert session_count == 2
+        count = db_session.scalar(_COUNT_BY_USER[model], {"uid": sample_user.id})
+        assert count == len(rows)
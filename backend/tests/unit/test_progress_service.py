@@ -16,6 +16,8 @@ from app.services.progress_service import (
     get_user_progress_summary,
     advance_user_level,
     get_level_history,
+    _get_conversation_message_count,
+    _count_conversation_messages_in_python,
     LEVEL_ORDER,
     SCORE_THRESHOLD,
     MINIMUM_ATTEMPTS,
@@ -25,6 +27,49 @@ from app.services.progress_service import (
 from app.db.models import User, UserProgress, ConversationSession
 from datetime import datetime
 
+# 5 user messages per session; 6 sessions give 30, above CONVERSATION_MINIMUM
+_SESSION_MESSAGES = [{"role": "user", "content": f"Message {j}"} for j in range(5)]
+
+
+def _make_user_with_progress(db_session, score, correct_attempts, **user_fields):
+    """
+    Insert an A1 user with 30 attempts in every scored module and 6 conversation sessions.
+    
+    Everything is added with one add_all and committed once.
+    """
+    user = User(
+        id=str(uuid4()),
+        username="testuser",
+        hashed_password="hash",
+        target_language="German",
+        level="A1",
+        total_xp=0,
+        **user_fields
+    )
+    progresses = [
+        UserProgress(
+            id=str(uuid4()),
+            user_id=user.id,
+            module=module,
+            score=score,
+            total_attempts=30,
+            correct_attempts=correct_attempts
+        )
+        for module in ["vocabulary", "grammar", "writing", "phonetics"]
+    ]
+    sessions = [
+        ConversationSession(
+            id=str(uuid4()),
+            user_id=user.id,
+            target_language="German",
+            context_json={"messages": _SESSION_MESSAGES}
+        )
+        for _ in range(6)
+    ]
+    db_session.add_all([user, *progresses, *sessions])
+    db_session.commit()
+    return user
+
 
 class TestLevelProgression:
     """Test level progression functionality."""
@@ -197,6 +242,62 @@ class TestAdvancementEligibility:
         assert result["eligible"] is False
 
 
+@pytest.mark.parametrize("count_messages", [
+    _get_conversation_message_count,
+    _count_conversation_messages_in_python
+], ids=["sql", "python"])
+class TestConversationMessageCount:
+    """Test counting the user's conversation messages."""
+    
+    @pytest.fixture(params=["sqlite", pytest.param("postgresql", marks=pytest.mark.postgres)])
+    def db_session(self, request, db_session):
+        """Run every case on SQLite and, when TEST_POSTGRES_URL is set, on PostgreSQL."""
+        if request.param == "postgresql":
+            return request.getfixturevalue("pg_session")
+        return db_session
+    
+    @pytest.mark.parametrize("contexts,expected", [
+        # Only the user's own messages count
+        ([{"messages": [{"role": "user"}, {"role": "assistant"}, {"role": "user"}]}], 2),
+        # Messages from every session are added up
+        ([{"messages": [{"role": "user"}]}, {"messages": [{"role": "user"}, {"role": "user"}]}], 3),
+        # Entries that aren't objects are skipped
+        ([{"messages": ["user", 3, None, ["user"], {"role": "user"}]}], 1),
+        # Missing or non-list messages count as 0
+        ([{}], 0),
+        ([{"messages": None}], 0),
+        ([{"messages": "user"}], 0),
+        ([{"messages": {"a": {"role": "user"}}}], 0),
+        ([{"messages": {"role": "user"}}], 0),
+    ], ids=[
+        "assistant_excluded", "summed_across_sessions", "non_dict_entries",
+        "missing", "null", "string", "object_of_messages", "single_message_object"
+    ])
+    def test_counts_user_messages(self, db_session, make_user, count_messages, contexts, expected):
+        """Test that only user-role entries of a messages list are counted."""
+        user = make_user("German", "A1")
+        db_session.add_all([
+            ConversationSession(user_id=user.id, target_language="German", context_json=context)
+            for context in contexts
+        ])
+        db_session.flush()
+        
+        assert count_messages(user.id, db_session) == expected
+    
+    def test_ignores_other_users_sessions(self, db_session, make_user, count_messages):
+        """Test that messages in another user's sessions are not counted."""
+        user = make_user("German", "A1", username="learner")
+        other = make_user("German", "A1", username="other")
+        db_session.add(ConversationSession(
+            user_id=other.id,
+            target_language="German",
+            context_json={"messages": [{"role": "user"}]}
+        ))
+        db_session.flush()
+        
+        assert count_messages(user.id, db_session) == 0
+
+
 class TestProgressSummary:
     """Test progress summary generation."""
     
@@ -259,26 +360,24 @@ class TestConstants:
         expected_levels = ["A1", "A2", "B1", "B2", "C1", "C2"]
         assert LEVEL_ORDER == expected_levels
     
-    def test_score_threshold_is_reasonable(self):
-        """Test that score threshold is between 0 and 100."""
-        assert 0 < SCORE_THRESHOLD <= 100
-        assert SCORE_THRESHOLD >= 70  # At least 70% is reasonable
-    
-    def test_minimum_attempts_is_positive(self):
-        """Test that minimum attempts is a positive number."""
-        assert MINIMUM_ATTEMPTS > 0
-        assert isinstance(MINIMUM_ATTEMPTS, int)
+    @pytest.mark.parametrize("value,minimum,maximum,expected_type", [
+        # At least 70% is a reasonable pass mark
+        (SCORE_THRESHOLD, 70, 100, (int, float)),
+        (MINIMUM_ATTEMPTS, 1, None, int),
+        (CONVERSATION_MINIMUM, 1, None, int),
+    ], ids=["score_threshold", "minimum_attempts", "conversation_minimum"])
+    def test_threshold_is_in_range(self, value, minimum, maximum, expected_type):
+        """Test that each advancement threshold has a sensible type and range."""
+        assert isinstance(value, expected_type)
+        assert value >= minimum
+        if maximum is not None:
+            assert value <= maximum
     
-    def test_conversation_minimum_is_positive(self):
-        """Test that conversation minimum is positive."""
-        assert CONVERSATION_MINIMUM > 0
-        assert isinstance(CONVERSATION_MINIMUM, int)
-    
-    def test_xp_rewards_defined_for_all_levels(self):
+    @pytest.mark.parametrize("level", LEVEL_ORDER)
+    def test_xp_rewards_defined_for_all_levels(self, level):
         """Test that XP rewards exist for all levels."""
-        for level in LEVEL_ORDER:
-            assert level in XP_REWARDS
-            assert XP_REWARDS[level] > 0
+        assert level in XP_REWARDS
+        assert XP_REWARDS[level] > 0
     
     def test_xp_rewards_increase_with_level(self):
         """Test that XP rewards generally increase with difficulty."""
@@ -293,46 +392,12 @@ class TestAdvanceUserLevel:
         """Test successful level advancement."""
         from datetime import datetime, timedelta
         
-        # Create user at A1
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="German",
-            level="A1",
-            level_started_at=datetime.utcnow() - timedelta(days=10),
-            total_xp=0
+        user = _make_user_with_progress(
+            db_session,
+            score=85.0,
+            correct_attempts=25,
+            level_started_at=datetime.utcnow() - timedelta(days=10)
         )
-        db_session.add(user)
-        db_session.commit()
-        
-        # Create progress for all modules with good scores
-        for module in ["vocabulary", "grammar", "writing", "phonetics"]:
-            progress = UserProgress(
-                id=str(uuid4()),
-                user_id=user.id,
-                module=module,
-                score=85.0,
-                total_attempts=30,
-                correct_attempts=25
-            )
-            db_session.add(progress)
-        
-        # Create conversation sessions with messages
-        for i in range(6):
-            session = ConversationSession(
-                id=str(uuid4()),
-                user_id=user.id,
-                target_language="German",
-                context_json={
-                    "messages": [
-                        {"role": "user", "content": f"Message {j}"}
-                        for j in range(5)  # 5 messages per session = 30 total
-                    ]
-                }
-            )
-            db_session.add(session)
-        
-        db_session.commit()
         
         result = advance_user_level(user.id, db_session)
         
@@ -389,45 +454,12 @@ class TestAdvanceUserLevel:
         """Test that advancement resets module progress."""
         from datetime import datetime
         
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="German",
-            level="A1",
-            level_started_at=datetime.utcnow(),
-            total_xp=0
+        user = _make_user_with_progress(
+            db_session,
+            score=90.0,
+            correct_attempts=27,
+            level_started_at=datetime.utcnow()
         )
-        db_session.add(user)
-        db_session.commit()
-        
-        # Create progress
-        for module in ["vocabulary", "grammar", "writing", "phonetics"]:
-            progress = UserProgress(
-                id=str(uuid4()),
-                user_id=user.id,
-                module=module,
-                score=90.0,
-                total_attempts=30,
-                correct_attempts=27
-            )
-            db_session.add(progress)
-        
-        # Create conversation sessions with messages
-        for i in range(6):
-            session = ConversationSession(
-                id=str(uuid4()),
-                user_id=user.id,
-                target_language="German",
-                context_json={
-                    "messages": [
-                        {"role": "user", "content": f"Message {j}"}
-                        for j in range(5)  # 5 messages per session = 30 total
-                    ]
-                }
-            )
-            db_session.add(session)
-        
-        db_session.commit()
         
         advance_user_level(user.id, db_session)
         
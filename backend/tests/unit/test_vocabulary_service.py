@@ -8,67 +8,55 @@ Tests:
 - Progress tracking
 """
 
+import json
 import pytest
-from unittest.mock import AsyncMock, patch
 from app.services.vocabulary import (
+    _generate_image_description_prompt,
     get_next_flashcard,
     submit_vocabulary_answer
 )
-from app.db.models import User, UserProgress
 from app.schemas.vocabulary import VocabularyAnswerRequest
+from tests.support.db import assert_progress
+from tests.support.stubs import RecordedLLM, fence
+
+
+def _card(word, definition, example_sentence, options=("a", "b", "c", "d")):
+    """Build a flashcard payload whose first option is correct."""
+    return {
+        "word": word,
+        "definition": definition,
+        "example_sentence": example_sentence,
+        "options": list(options),
+        "correct_option_index": 0
+    }
+
+
+# LLM, checker and validator replies, serialized once at import rather than in every test
+FLASHCARD_DE_A1 = fence(json.dumps(_card("Buch", "book", "Ich lese ein Buch", ["book", "pen", "table", "chair"])))
+FLASHCARD_PT_B2 = fence(json.dumps(_card("livro", "book", "Eu leio um livro", ["book", "pen", "table", "door"])))
+FLASHCARD_BAD = fence(json.dumps(_card("Bad", "bad definition", "bad example", ["a", "b"])))
+FLASHCARD_FIXED = json.dumps(_card("Good", "good definition", "good example"))
+FLASHCARD_ORIGINAL = fence(json.dumps(_card("Original", "original definition", "original example")))
+FLASHCARD_IMPROVED = json.dumps(_card("Improved", "improved definition", "improved example"))
 
 
 class TestFlashcardGeneration:
     """Test flashcard generation."""
     
-    @pytest.mark.asyncio
-    async def test_generate_flashcard_returns_valid_data(self, db_session):
+    pytestmark = pytest.mark.xdist_group(name="vocab_mock")
+    
+    async def test_generate_flashcard_returns_valid_data(self, db_session, make_user, vocab_mocks):
         """Test that flashcard has correct structure."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="German",
-            level="A1"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("German", "A1")
         
-        flashcard_json = {
-            "word": "Buch",
-            "definition": "book",
-            "example_sentence": "Ich lese ein Buch",
-            "options": ["book", "pen", "table", "chair"],
-            "correct_option_index": 0
-        }
+        vocab_mocks.llm.script(FLASHCARD_DE_A1, "an open book on a wooden table")
         
-        import json
-        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
-             patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
-             patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator:
-            
-            mock_llm = AsyncMock()
-            mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(flashcard_json)}\n```")
-            mock_llm.close = AsyncMock()
-            mock_get_llm.return_value = mock_llm
-            
-            mock_checker = AsyncMock()
-            mock_checker.check_content = AsyncMock(return_value={"is_valid": True, "suggested_fix": None})
-            mock_get_checker.return_value = mock_checker
-            
-            mock_validator = AsyncMock()
-            mock_validator.deep_validate = AsyncMock(return_value={
-                "is_approved": True,
-                "confidence_score": 0.9,
-                "improved_version": None
-            })
-            mock_get_validator.return_value = mock_validator
-            
-            result = await get_next_flashcard(
-                user_id=user.id,
-                target_language="German",
-                level="A1",
-                db=db_session
-            )
+        result = await get_next_flashcard(
+            user_id=user.id,
+            target_language="German",
+            level="A1",
+            db=db_session
+        )
         
         assert result is not None
         assert result.word is not None
@@ -79,17 +67,11 @@ class TestFlashcardGeneration:
 class TestAnswerSubmission:
     """Test vocabulary answer submission."""
     
-    @pytest.mark.asyncio
-    async def test_correct_answer_updates_progress(self, db_session):
+    pytestmark = pytest.mark.xdist_group(name="vocab_db")
+    
+    async def test_correct_answer_updates_progress(self, db_session, make_user):
         """Test that correct answer updates progress."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="Spanish",
-            level="A2"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("Spanish", "A2")
         
         request = VocabularyAnswerRequest(
             flashcard_id="test-id",
@@ -107,25 +89,11 @@ class TestAnswerSubmission:
         assert result.is_correct is True
         
         # Check progress
-        progress = db_session.query(UserProgress).filter(
-            UserProgress.user_id == user.id,
-            UserProgress.module == "vocabulary"
-        ).first()
-        
-        assert progress is not None
-        assert progress.correct_attempts == 1
+        assert_progress(db_session, user.id, "vocabulary", correct=1)
     
-    @pytest.mark.asyncio
-    async def test_incorrect_answer_updates_progress(self, db_session):
+    async def test_incorrect_answer_updates_progress(self, db_session, make_user):
         """Test that incorrect answer updates progress."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="French",
-            level="B1"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("French", "B1")
         
         request = VocabularyAnswerRequest(
             flashcard_id="test-id-2",
@@ -142,72 +110,48 @@ class TestAnswerSubmission:
         
         assert result.is_correct is False
         
-        progress = db_session.query(UserProgress).filter(
-            UserProgress.user_id == user.id,
-            UserProgress.module == "vocabulary"
-        ).first()
-        
-        assert progress is not None
-        assert progress.total_attempts == 1
-        assert progress.correct_attempts == 0
+        assert_progress(db_session, user.id, "vocabulary", total=1, correct=0)
     
-    @pytest.mark.asyncio
-    async def test_multiple_answers_accumulate_score(self, db_session):
+    async def test_multiple_answers_accumulate_score(self, db_session, make_user):
         """Test multiple answers calculate score correctly."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="Italian",
-            level="A1"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("Italian", "A1")
         
-        # Submit 4 correct, 1 incorrect
-        for i in range(5):
-            is_correct = i < 4
-            request = VocabularyAnswerRequest(
-                flashcard_id=f"test-{i}",
+        # Submit 4 correct, 1 incorrect; the values are known-good, so skip validation
+        requests = [
+            VocabularyAnswerRequest.model_construct(
                 word=f"word{i}",
-                selected_option_index=0 if is_correct else 1,
+                selected_option_index=0 if i < 4 else 1,
                 correct_option_index=0
             )
-            
+            for i in range(5)
+        ]
+        
+        for request in requests:
             await submit_vocabulary_answer(
                 request=request,
                 current_user=user,
                 db=db_session
             )
         
-        progress = db_session.query(UserProgress).filter(
-            UserProgress.user_id == user.id,
-            UserProgress.module == "vocabulary"
-        ).first()
-        
-        assert progress.total_attempts == 5
-        assert progress.correct_attempts == 4
-        assert progress.score == 80.0  # 4/5 = 80%
+        # 4/5 = 80%
+        assert_progress(db_session, user.id, "vocabulary", total=5, correct=4, score=80.0)
 
 
 class TestImageDescriptionGeneration:
     """Test image description prompt generation."""
     
-    @pytest.mark.asyncio
-    async def test_generate_image_description_prompt(self, db_session):
+    pytestmark = pytest.mark.xdist_group(name="vocab_mock")
+    
+    async def test_generate_image_description_prompt(self):
         """Test image description generation."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm:
-            mock_llm = AsyncMock()
-            mock_llm.generate = AsyncMock(return_value="a red apple on a white table")
-            
-            result = await _generate_image_description_prompt(
-                word="apple",
-                definition="a round fruit",
-                example_sentence="I eat an apple",
-                target_language="English",
-                llm=mock_llm
-            )
+        # The client is passed in, so nothing needs patching
+        result = await _generate_image_description_prompt(
+            word="apple",
+            definition="a round fruit",
+            example_sentence="I eat an apple",
+            target_language="English",
+            llm=RecordedLLM("a red apple on a white table")
+        )
         
         assert result is not None
         assert isinstance(result, str)
@@ -216,54 +160,20 @@ class TestImageDescriptionGeneration:
 class TestVocabularyServiceEdgeCases:
     """Test edge cases in vocabulary service."""
     
-    @pytest.mark.asyncio
-    async def test_flashcard_without_topic(self, db_session):
+    pytestmark = pytest.mark.xdist_group(name="vocab_mock")
+    
+    async def test_flashcard_without_topic(self, db_session, make_user, vocab_mocks):
         """Test flashcard generation without specific topic."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="Portuguese",
-            level="B2"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("Portuguese", "B2")
         
-        flashcard_json = {
-            "word": "livro",
-            "definition": "book",
-            "example_sentence": "Eu leio um livro",
-            "options": ["book", "pen", "table", "door"],
-            "correct_option_index": 0
-        }
+        vocab_mocks.llm.script(FLASHCARD_PT_B2, "an open book on a wooden table")
         
-        import json
-        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
-             patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
-             patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator:
-            
-            mock_llm = AsyncMock()
-            mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(flashcard_json)}\n```")
-            mock_llm.close = AsyncMock()
-            mock_get_llm.return_value = mock_llm
-            
-            mock_checker = AsyncMock()
-            mock_checker.check_content = AsyncMock(return_value={"is_valid": True, "suggested_fix": None})
-            mock_get_checker.return_value = mock_checker
-            
-            mock_validator = AsyncMock()
-            mock_validator.deep_validate = AsyncMock(return_value={
-                "is_approved": True,
-                "confidence_score": 0.85,
-                "improved_version": None
-            })
-            mock_get_validator.return_value = mock_validator
-            
-            result = await get_next_flashcard(
-                user_id=user.id,
-                target_language="Portuguese",
-                level="B2",
-                db=db_session
-            )
+        result = await get_next_flashcard(
+            user_id=user.id,
+            target_language="Portuguese",
+            level="B2",
+            db=db_session
+        )
         
         assert result is not None
 
@@ -271,170 +181,71 @@ class TestVocabularyServiceEdgeCases:
 class TestVocabularyErrorHandling:
     """Test vocabulary error handling and edge cases."""
     
-    @pytest.mark.asyncio
-    async def test_checker_suggested_fix_applied(self, db_session):
+    pytestmark = pytest.mark.xdist_group(name="vocab_mock")
+    
+    async def test_checker_suggested_fix_applied(self, db_session, make_user, vocab_mocks):
         """Test that checker suggested fix is applied."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="German"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("German")
         
-        original_json = {
-            "word": "Bad",
-            "definition": "bad definition",
-            "example_sentence": "bad example",
-            "options": ["a", "b"],
-            "correct_option_index": 0
+        vocab_mocks.llm.script(FLASHCARD_BAD, "a good visual description")
+        vocab_mocks.checker.check_content.return_value = {
+            "is_valid": False,
+            "suggested_fix": FLASHCARD_FIXED
         }
         
-        fixed_json = {
-            "word": "Good",
-            "definition": "good definition",
-            "example_sentence": "good example",
-            "options": ["a", "b", "c", "d"],
-            "correct_option_index": 0
-        }
+        result = await get_next_flashcard(
+            user_id=user.id,
+            target_language="German",
+            level="A1",
+            db=db_session
+        )
         
-        import json
-        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
-             patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
-             patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator, \
-             patch('app.services.vocabulary.get_image_client') as mock_get_image:
-            
-            mock_llm = AsyncMock()
-            mock_llm.generate = AsyncMock(side_effect=[
-                f"```json\n{json.dumps(original_json)}\n```",
-                "a good visual description"
-            ])
-            mock_llm.close = AsyncMock()
-            mock_get_llm.return_value = mock_llm
-            
-            mock_checker = AsyncMock()
-            mock_checker.check_content = AsyncMock(return_value={
-                "is_valid": False,
-                "suggested_fix": json.dumps(fixed_json)
-            })
-            mock_get_checker.return_value = mock_checker
-            
-            mock_validator = AsyncMock()
-            mock_validator.deep_validate = AsyncMock(return_value={
-                "is_approved": True,
-                "improved_version": None,
-                "confidence_score": 0.9
-            })
-            mock_get_validator.return_value = mock_validator
-            
-            mock_image = AsyncMock()
-            mock_image.generate_safe_image = AsyncMock(return_value="base64imagedata")
-            mock_get_image.return_value = mock_image
-            
-            result = await get_next_flashcard(
-                user_id=user.id,
-                target_language="German",
-                level="A1",
-                db=db_session
-            )
-            
-            assert result.word == "Good"
+        assert result.word == "Good"
     
-    @pytest.mark.asyncio
-    async def test_secondary_validator_improvement_applied(self, db_session):
+    async def test_secondary_validator_improvement_applied(self, db_session, make_user, vocab_mocks):
         """Test that secondary validator improvement is applied."""
-        user = User(
-            username="testuser",
-            hashed_password="hash",
-            target_language="German"
-        )
-        db_session.add(user)
-        db_session.commit()
+        user = make_user("German")
         
-        original_json = {
-            "word": "Original",
-            "definition": "original definition",
-            "example_sentence": "original example",
-            "options": ["a", "b", "c", "d"],
-            "correct_option_index": 0
+        vocab_mocks.llm.script(FLASHCARD_ORIGINAL, "visual description")
+        vocab_mocks.validator.deep_validate.return_value = {
+            "is_approved": False,
+            "improved_version": FLASHCARD_IMPROVED,
+            "confidence_score": 0.8
         }
         
-        improved_json = {
-            "word": "Improved",
-            "definition": "improved definition",
-            "example_sentence": "improved example",
-            "options": ["a", "b", "c", "d"],
-            "correct_option_index": 0
-        }
+        result = await get_next_flashcard(
+            user_id=user.id,
+            target_language="German",
+            level="A1",
+            db=db_session
+        )
         
-        import json
-        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
-             patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
-             patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator, \
-             patch('app.services.vocabulary.get_image_client') as mock_get_image:
-            
-            mock_llm = AsyncMock()
-            mock_llm.generate = AsyncMock(side_effect=[
-                f"```json\n{json.dumps(original_json)}\n```",
-                "visual description"
-            ])
-            mock_llm.close = AsyncMock()
-            mock_get_llm.return_value = mock_llm
-            
-            mock_checker = AsyncMock()
-            mock_checker.check_content = AsyncMock(return_value={
-                "is_valid": True,
-                "suggested_fix": None
-            })
-            mock_get_checker.return_value = mock_checker
-            
-            mock_validator = AsyncMock()
-            mock_validator.deep_validate = AsyncMock(return_value={
-                "is_approved": False,
-                "improved_version": json.dumps(improved_json),
-                "confidence_score": 0.8
-            })
-            mock_get_validator.return_value = mock_validator
-            
-            mock_image = AsyncMock()
-            mock_image.generate_safe_image = AsyncMock(return_value="base64imagedata")
-            mock_get_image.return_value = mock_image
-            
-            result = await get_next_flashcard(
-                user_id=user.id,
-                target_language="German",
-                level="A1",
-                db=db_session
-            )
-            
-            assert result.word == "Improved"
+        assert result.word == "Improved"
     
-    @pytest.mark.asyncio
-    async def test_image_description_fallback_for_short_response(self):
-        """Test fallback when LLM response is too short."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(return_value="book")  # Too short
-        
+    @pytest.mark.parametrize("word,definition,example_sentence,reply,expected", [
+        # Too short (< 5 chars), so the definition is used as is
+        ("Buch", "book", "Ich lese ein Buch", "book", "book, clear and simple composition"),
+        # The "to " prefix is stripped
+        ("run", "to run", "I run every day", "x", "run, clear and simple composition"),
+        # Article prefixes are stripped
+        ("apple", "an apple", "I eat an apple", "x", "apple, clear and simple composition"),
+        ("car", "the car", "I drive the car", "ab", "car, clear and simple composition"),
+    ], ids=["short_response", "to_prefix", "an_prefix", "the_prefix"])
+    async def test_image_description_fallback(self, word, definition, example_sentence, reply, expected):
+        """Test the fallback description built from the definition when the LLM reply is too short."""
         result = await _generate_image_description_prompt(
-            word="Buch",
-            definition="book",
-            example_sentence="Ich lese ein Buch",
-            target_language="German",
-            llm=mock_llm
+            word=word,
+            definition=definition,
+            example_sentence=example_sentence,
+            target_language="English",
+            llm=RecordedLLM(reply)
         )
         
-        assert "book" in result
-        assert "clear and simple composition" in result
+        assert expected in result
     
-    @pytest.mark.asyncio
     async def test_image_description_fallback_on_exception(self):
         """Test fallback when LLM raises exception."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(side_effect=Exception("API Error"))
+        mock_llm = RecordedLLM(Exception("API Error"))
         
         result = await _generate_image_description_prompt(
             word="Buch",
@@ -447,69 +258,9 @@ class TestVocabularyErrorHandling:
         assert "book" in result
         assert "clear and simple composition" in result
 
-    @pytest.mark.asyncio
-    async def test_image_description_strips_prefixes(self):
-        """Test that image description strips common prefixes from definition."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(return_value="x")  # Too short (< 5 chars), will use fallback
-        
-        result = await _generate_image_description_prompt(
-            word="run",
-            definition="to run",
-            example_sentence="I run every day",
-            target_language="English",
-            llm=mock_llm
-        )
-        
-        # Should strip "to " prefix
-        assert "run, clear and simple composition" in result
-        
-    @pytest.mark.asyncio
-    async def test_image_description_strips_article_prefixes(self):
-        """Test that image description strips article prefixes."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(return_value="x")  # Too short
-        
-        result = await _generate_image_description_prompt(
-            word="apple",
-            definition="an apple",
-            example_sentence="I eat an apple",
-            target_language="English",
-            llm=mock_llm
-        )
-        
-        # Should strip "an " prefix
-        assert "apple, clear and simple composition" in result
-    
-    @pytest.mark.asyncio
-    async def test_image_description_with_the_prefix(self):
-        """Test stripping 'the' prefix from definition."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(return_value="ab")  # Too short
-        
-        result = await _generate_image_description_prompt(
-            word="car",
-            definition="the car",
-            example_sentence="I drive the car",
-            target_language="English",
-            llm=mock_llm
-        )
-        
-        assert "car, clear and simple composition" in result
-    
-    @pytest.mark.asyncio
     async def test_image_description_successful_generation(self):
         """Test successful LLM generation of description."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
-        mock_llm.generate = AsyncMock(return_value="A friendly golden retriever playing in a park")
+        mock_llm = RecordedLLM("A friendly golden retriever playing in a park")
         
         result = await _generate_image_description_prompt(
             word="dog",
@@ -523,14 +274,10 @@ class TestVocabularyErrorHandling:
         assert "golden retriever" in result
         assert "park" in result
     
-    @pytest.mark.asyncio
     async def test_image_description_too_long_uses_fallback(self):
         """Test that very long descriptions use fallback."""
-        from app.services.vocabulary import _generate_image_description_prompt
-        
-        mock_llm = AsyncMock()
         long_description = "a" * 150  # More than 120 chars
-        mock_llm.generate = AsyncMock(return_value=long_description)
+        mock_llm = RecordedLLM(long_description)
         
         result = await _generate_image_description_prompt(
             word="elephant",